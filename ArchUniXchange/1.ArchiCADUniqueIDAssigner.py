@@ -3,7 +3,7 @@ ArchiCAD Ultra-Fast Smart Element ID Assignment Script (TeamWork Compatible)
 =========================================================================
 
 Ultra-fast script to assign unique Element IDs only to elements that need them.
-Processes elements individually for immediate feedback and fastest possible speed.
+Processes elements in batches for fast round-trips with regular progress feedback.
 Handles TeamWork permissions gracefully without long delays.
 
 Requirements:
@@ -17,34 +17,68 @@ Date: 2025-06-15
 import archicad
 from archicad import ACConnection
 import os
-from typing import Dict, List, Set
+import re
+from typing import Callable, Dict, Optional, Set
 import logging
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 
 # Configure simple logging
 current_dir = os.path.dirname(os.path.abspath(__file__)) if __file__ else os.getcwd()
 log_file_path = os.path.join(current_dir, 'archicad_smart_id_assignment.log')
 
+log_file_handler = logging.FileHandler(log_file_path, delay=True)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler(log_file_path),
+        log_file_handler,
         logging.StreamHandler()
     ]
 )
 
+# Per-element progress goes to the log file only to keep console writes low
+progress_logger = logging.getLogger('smart_id_assignment.progress')
+progress_logger.addHandler(log_file_handler)
+progress_logger.propagate = False
+
+# Marks an Element ID that has already been seen on more than one element
+_DUPLICATE = object()
+
+# An element whose new ID could not be assigned
+FailedElement = namedtuple('FailedElement', 'guid new_id reason')
+
+
 class SmartUniqueIDAssigner:
     """
     Ultra-fast smart unique ID assignment for building elements in ArchiCAD models.
     Only assigns new IDs to elements with duplicates or empty IDs.
     Preserves existing unique IDs for maximum efficiency.
-    Uses individual element processing for immediate feedback and fastest speed.
+    Uses batched element processing for fewer round-trips and regular feedback.
     Handles TeamWork permission restrictions gracefully without long delays.
     """
     
-    def __init__(self):
-        """Initialize connection to ArchiCAD."""
+    # Matches generated-style IDs such as W-001 or CW-012
+    _ID_PATTERN = re.compile(r'^([A-Z]+)-(\d+)$')
+    
+    # Error messages that indicate a TeamWork reservation rather than a real failure
+    _PERMISSION_RE = re.compile(r'permission|teamwork|reserved', re.IGNORECASE)
+    
+    # Elements per GetPropertyValuesOfElements request when reading existing IDs
+    _ID_READ_CHUNK_SIZE = 5000
+    
+    def __init__(self, batch_size: int = 500, generate_report: bool = True):
+        """Initialize connection to ArchiCAD.
+        
+        Args:
+            batch_size: Number of elements sent per SetPropertyValuesOfElements call
+            generate_report: Write smart_id_assignment_report.txt after assignment
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.batch_size = batch_size
+        self.generate_report = generate_report
+        
         try:
             print("Connecting to ArchiCAD...")
             self.conn = ACConnection.connect()
@@ -84,63 +118,68 @@ class SmartUniqueIDAssigner:
             'Zone', 'Mesh', 'Morph', 'Shell', 'Object'
         ]
         
-    def get_all_elements_fast(self) -> List:
-        """Get all 3D elements quickly with their types."""
+        # Element ID property never changes during a session - looked up once on first use
+        self._element_id_property = None
+        
+    @property
+    def element_id_property(self):
+        """Built-in Element ID property, fetched from ArchiCAD on first access."""
+        if self._element_id_property is None:
+            self._element_id_property = self.acu.GetBuiltInPropertyId('General_ElementID')
+        return self._element_id_property
+    
+    def get_all_elements_fast(self) -> Dict:
+        """Get all 3D elements quickly as parallel 'guids' and 'types' lists."""
         print("Getting all elements...")
-        all_elements = []
+        guids = []
+        types = []
         
+        # One request at a time: the connection's commands share a single request object.
+        # Only GUID and type are used downstream, so the element objects are not kept.
         for elem_type in self.available_element_types:
             try:
                 elements = self.acc.GetElementsByType(elem_type)
-                for element in elements:
-                    all_elements.append({
-                        'element': element,
-                        'type': elem_type,
-                        'guid': element.elementId.guid
-                    })
+                guids.extend(element.elementId.guid for element in elements)
+                types.extend([elem_type] * len(elements))
                 print(f"  Found {len(elements)} {elem_type} elements")
             except Exception as e:
                 print(f"  Warning: Could not get {elem_type} elements: {e}")
         
-        print(f"Total elements found: {len(all_elements)}")
-        return all_elements
+        print(f"Total elements found: {len(guids)}")
+        return {'guids': guids, 'types': types}
     
-    def get_existing_ids_bulk(self, elements: List) -> Dict[str, str]:
-        """Get all existing Element IDs in one bulk operation."""
+    def get_existing_ids_bulk(self, elements: Dict) -> Optional[Dict[str, str]]:
+        """Get all existing Element IDs in bulk, or None if they could not be read."""
         print("Getting existing Element IDs...")
         
-        existing_ids = {}
-        
         try:
             # Get Element ID property
-            element_id_property = self.acu.GetBuiltInPropertyId('General_ElementID')
+            element_id_property = self.element_id_property
             
             # Create element wrappers
-            element_wrappers = []
-            for elem_data in elements:
-                wrapper = self.act.ElementIdArrayItem(self.act.ElementId(elem_data['guid']))
-                element_wrappers.append(wrapper)
-            
-            # Get all Element IDs in bulk
-            all_id_values = self.acc.GetPropertyValuesOfElements(element_wrappers, [element_id_property])
-            
-            for i, id_value_wrapper in enumerate(all_id_values):
-                if i < len(elements):
-                    element_guid = elements[i]['guid']
-                    
-                    if id_value_wrapper.propertyValues and len(id_value_wrapper.propertyValues) > 0:
-                        prop_value = id_value_wrapper.propertyValues[0].propertyValue
-                        if hasattr(prop_value, 'value') and prop_value.value:
-                            existing_ids[element_guid] = str(prop_value.value)
-                        else:
-                            existing_ids[element_guid] = ""
-                    else:
-                        existing_ids[element_guid] = ""
+            element_wrappers = [self.act.ElementIdArrayItem(self.act.ElementId(element_guid))
+                                for element_guid in elements['guids']]
+            
+            # Get all Element IDs in bounded chunks for large models, one request at a time
+            # (the connection's commands share a single request object)
+            chunk_size = self._ID_READ_CHUNK_SIZE
+            all_id_values = []
+            for start in range(0, len(element_wrappers), chunk_size):
+                all_id_values.extend(self.acc.GetPropertyValuesOfElements(
+                    element_wrappers[start:start + chunk_size], [element_id_property]))
+            
+            existing_ids = {
+                element_guid: (str(id_value_wrapper.propertyValues[0].propertyValue.value)
+                               if id_value_wrapper.propertyValues
+                               and getattr(id_value_wrapper.propertyValues[0].propertyValue, 'value', None)
+                               else "")
+                for element_guid, id_value_wrapper in zip(elements['guids'], all_id_values)
+            }
                         
         except Exception as e:
-            print(f"  Warning: Error getting existing IDs: {e}")
-            for elem_data in elements:
-                existing_ids[elem_data['guid']] = ""
+            # Treating unread IDs as empty would overwrite every existing ID, so give up instead
+            print(f"  Error getting existing IDs: {e}")
+            return None
         
         existing_count = len([id_val for id_val in existing_ids.values() if id_val])
         print(f"  Found {existing_count} elements with existing IDs")
@@ -150,42 +189,53 @@ class SmartUniqueIDAssigner:
         """Analyze existing IDs to find duplicates and empty ones."""
         print("Analyzing existing IDs for duplicates...")
         
-        # Count occurrences of each ID
-        id_counts = {}
+        # Single pass: remember the first owner of each ID, mark it once a second owner appears
+        first_seen = {}
+        duplicate_ids = {}
         empty_ids = []
+        claim_id = first_seen.setdefault
         
         for element_guid, element_id in existing_ids.items():
-            if not element_id or element_id.strip() == "":
+            clean_id = element_id.strip() if element_id else ""
+            if not clean_id:
                 empty_ids.append(element_guid)
+                continue
+            
+            # One dict probe for the common first-occurrence case
+            previous_guid = claim_id(clean_id, element_guid)
+            if previous_guid is element_guid:
+                continue
+            if previous_guid is not _DUPLICATE:
+                # Second occurrence - both owners need new IDs
+                duplicate_ids[previous_guid] = clean_id
+                duplicate_ids[element_guid] = clean_id
+                first_seen[clean_id] = _DUPLICATE
             else:
-                clean_id = element_id.strip()
-                if clean_id not in id_counts:
-                    id_counts[clean_id] = []
-                id_counts[clean_id].append(element_guid)
-        
-        # Find duplicates
-        duplicate_ids = {}
-        unique_ids = set()
-        
-        for element_id, element_guids in id_counts.items():
-            if len(element_guids) > 1:
-                # This ID is duplicated
-                for guid in element_guids:
-                    duplicate_ids[guid] = element_id
-            else:
-                # This ID is unique - keep it
-                unique_ids.add(element_id)
+                duplicate_ids[element_guid] = clean_id
+        
+        # IDs seen exactly once are unique - keep them, remembering only the highest counter per prefix
+        unique_count = 0
+        max_counter_per_prefix = {}
+        for element_id, guid in first_seen.items():
+            if guid is _DUPLICATE:
+                continue
+            unique_count += 1
+            match = self._ID_PATTERN.match(element_id)
+            if match:
+                prefix, number = match.groups()
+                max_counter_per_prefix[prefix] = max(max_counter_per_prefix.get(prefix, 0), int(number))
         
         # Elements that need new IDs
-        elements_needing_new_ids = set(empty_ids + list(duplicate_ids.keys()))
+        elements_needing_new_ids = set(empty_ids)
+        elements_needing_new_ids.update(duplicate_ids)
         
         analysis = {
             'total_elements': len(existing_ids),
-            'unique_ids': len(unique_ids),
+            'unique_ids': unique_count,
             'empty_ids': len(empty_ids),
             'duplicate_count': len(duplicate_ids),
             'elements_needing_new_ids': elements_needing_new_ids,
-            'existing_unique_ids': unique_ids,
+            'max_counter_per_prefix': max_counter_per_prefix,
             'duplicate_elements': duplicate_ids
         }
         
@@ -197,32 +247,29 @@ class SmartUniqueIDAssigner:
         
         return analysis
     
-    def generate_new_ids_for_problem_elements(self, elements: List, analysis: Dict) -> Dict[str, str]:
+    def generate_new_ids_for_problem_elements(self, elements: Dict, analysis: Dict) -> Dict[str, str]:
         """Generate new IDs only for elements that need them."""
         print("Generating new IDs only for problem elements...")
         
         elements_needing_new_ids = analysis['elements_needing_new_ids']
-        existing_unique_ids = analysis['existing_unique_ids']
+        max_counter_per_prefix = analysis['max_counter_per_prefix']
         
         if not elements_needing_new_ids:
             print("  No elements need new IDs - all are already unique!")
             return {}
         
-        # Filter elements to only those needing new IDs
-        problem_elements = []
-        for elem_data in elements:
-            if elem_data['guid'] in elements_needing_new_ids:
-                problem_elements.append(elem_data)
-        
-        print(f"  Processing {len(problem_elements)} elements that need new IDs")
-        
-        # Group problem elements by type
+        # Filter elements to only those needing new IDs, grouped by type
         elements_by_type = defaultdict(list)
-        for elem_data in problem_elements:
-            elements_by_type[elem_data['type']].append(elem_data)
+        problem_count = 0
+        for element_guid, element_type in zip(elements['guids'], elements['types']):
+            if element_guid in elements_needing_new_ids:
+                elements_by_type[element_type].append(element_guid)
+                problem_count += 1
         
-        # All existing IDs (including unique ones we're keeping)
-        all_reserved_ids = set(existing_unique_ids)
+        print(f"  Processing {problem_count} elements that need new IDs")
+        
+        # Next free counter per prefix, starting after the highest existing ID we're keeping
+        next_counter = {prefix: number + 1 for prefix, number in max_counter_per_prefix.items()}
         
         # Generate new IDs by type
         new_id_mapping = {}
@@ -232,24 +279,13 @@ class SmartUniqueIDAssigner:
             
             print(f"    Assigning new IDs to {len(type_elements)} {element_type} elements")
             
-            # Find the next available counter for this prefix
-            counter = 1
-            while f"{prefix}-{counter:03d}" in all_reserved_ids:
-                counter += 1
-            
-            for elem_data in type_elements:
-                element_guid = elem_data['guid']
-                
-                # Generate next available unique ID
-                while True:
-                    new_id = f"{prefix}-{counter:03d}"
-                    if new_id not in all_reserved_ids:
-                        break
-                    counter += 1
-                
-                new_id_mapping[element_guid] = new_id
-                all_reserved_ids.add(new_id)
+            # Bind the format once per type rather than rebuilding the f-string per element
+            format_id = (prefix + "-{:03d}").format
+            counter = next_counter.get(prefix, 1)
+            for element_guid in type_elements:
+                new_id_mapping[element_guid] = format_id(counter)
                 counter += 1
+            next_counter[prefix] = counter
         
         print(f"  Generated {len(new_id_mapping)} new unique IDs")
         return new_id_mapping
@@ -260,84 +296,85 @@ class SmartUniqueIDAssigner:
         
         try:
             # Get Element ID property
-            element_id_property = self.acu.GetBuiltInPropertyId('General_ElementID')
+            element_id_property = self.element_id_property
             
-            # Process elements individually for fastest response and immediate feedback
+            # Process elements in batches to keep round-trips low while giving regular feedback
             success_count = 0
             permission_denied_count = 0
             other_errors = 0
             failed_elements = []
             
             total_elements = len(new_id_mapping)
+            batch_size = self.batch_size
             
-            print(f"  Processing {total_elements} elements individually for speed...")
+            print(f"  Processing {total_elements} elements in batches of {batch_size}...")
             print("  Press Ctrl+C to stop early if needed")
             
-            for i, (element_guid, new_id) in enumerate(new_id_mapping.items(), 1):
+            items = list(new_id_mapping.items())
+            
+            # Resolve payload constructors once instead of per element
+            make_assignment = self.act.ElementPropertyValue
+            make_element_id = self.act.ElementId
+            make_string_value = self.act.NormalStringPropertyValue
+            
+            done = 0
+            for start in range(0, total_elements, batch_size):
+                batch_items = items[start:start + batch_size]
                 try:
-                    # Create property value
-                    property_value = self.act.NormalStringPropertyValue(new_id)
-                    
-                    # Create element property value assignment
-                    element_property_value = self.act.ElementPropertyValue(
-                        elementId=self.act.ElementId(element_guid),
-                        propertyId=element_id_property,
-                        propertyValue=property_value
-                    )
+                    # Assignments stay parallel to batch_items so each result maps back by index
+                    assignments = [
+                        make_assignment(
+                            elementId=make_element_id(element_guid),
+                            propertyId=element_id_property,
+                            propertyValue=make_string_value(new_id)
+                        )
+                        for element_guid, new_id in batch_items
+                    ]
                     
-                    # Process single element with immediate response
-                    results = self.acc.SetPropertyValuesOfElements([element_property_value])
+                    # One round-trip per batch instead of one per element
+                    results = self.acc.SetPropertyValuesOfElements(assignments) or []
                     
-                    if results and len(results) > 0:
-                        result = results[0]
-                        if result.success:
+                    for offset, (element_guid, new_id) in enumerate(batch_items):
+                        i = start + offset + 1
+                        result = results[offset] if offset < len(results) else None
+                        
+                        if result is None:
+                            other_errors += 1
+                            print(f"    ❌ {i}/{total_elements}: {new_id} - No response")
+                            failed_elements.append(FailedElement(element_guid, new_id, 'No response from API'))
+                        elif result.success:
                             success_count += 1
-                            print(f"    ✓ {i}/{total_elements}: {new_id} assigned")
+                            progress_logger.info("%d/%d %s assigned", i, total_elements, new_id)
                         else:
                             error_msg = result.error.message if result.error else "Unknown error"
                             
-                            if "permission" in error_msg.lower() or "teamwork" in error_msg.lower() or "reserved" in error_msg.lower():
+                            if self._PERMISSION_RE.search(error_msg):
                                 permission_denied_count += 1
                                 print(f"    ⚠ {i}/{total_elements}: {new_id} - Permission denied")
-                                failed_elements.append({
-                                    'guid': element_guid,
-                                    'new_id': new_id,
-                                    'reason': 'TeamWork permission denied'
-                                })
+                                failed_elements.append(FailedElement(element_guid, new_id, 'TeamWork permission denied'))
                             else:
                                 other_errors += 1
                                 print(f"    ❌ {i}/{total_elements}: {new_id} - Error: {error_msg}")
-                                failed_elements.append({
-                                    'guid': element_guid,
-                                    'new_id': new_id,
-                                    'reason': error_msg
-                                })
-                    else:
-                        other_errors += 1
-                        print(f"    ❌ {i}/{total_elements}: {new_id} - No response")
-                        failed_elements.append({
-                            'guid': element_guid,
-                            'new_id': new_id,
-                            'reason': 'No response from API'
-                        })
-                    
-                    # Progress summary every 25 elements
-                    if i % 25 == 0:
-                        print(f"    Progress: {i}/{total_elements} ({success_count} success, {permission_denied_count} denied)")
+                                failed_elements.append(FailedElement(element_guid, new_id, error_msg))
+                        
+                        # Progress summary every 25 elements
+                        if i % 25 == 0:
+                            print(f"    Progress: {i}/{total_elements} ({success_count} success, {permission_denied_count} denied)")
+                        
+                        done = i
                         
                 except KeyboardInterrupt:
-                    print(f"\n  User stopped processing at element {i}/{total_elements}")
+                    print(f"\n  User stopped processing at element {done}/{total_elements}")
                     print(f"  Results so far: {success_count} success, {permission_denied_count} denied")
                     break
                     
                 except Exception as e:
-                    other_errors += 1
-                    print(f"    ❌ {i}/{total_elements}: {new_id} - Exception: {str(e)}")
-                    failed_elements.append({
-                        'guid': element_guid,
-                        'new_id': new_id,
-                        'reason': f'Processing error: {str(e)}'
-                    })
+                    # Batch call failed - record every element not yet processed
+                    for i, (element_guid, new_id) in enumerate(batch_items[done - start:], done + 1):
+                        other_errors += 1
+                        print(f"    ❌ {i}/{total_elements}: {new_id} - Exception: {str(e)}")
+                        failed_elements.append(FailedElement(element_guid, new_id, f'Processing error: {str(e)}'))
+                    done = start + len(batch_items)
                     continue
             
             # Final summary
@@ -366,29 +403,33 @@ class SmartUniqueIDAssigner:
                 'total_attempted': len(new_id_mapping)
             }
     
-    def generate_assignment_report(self, elements: List, analysis: Dict, new_id_mapping: Dict[str, str], existing_ids: Dict[str, str], assignment_results: Dict) -> str:
-        """Generate a summary report of ID assignments including TeamWork issues."""
+    def generate_assignment_report(self, write: Callable[[str], object], elements: Dict, analysis: Dict, new_id_mapping: Dict[str, str], existing_ids: Dict[str, str], assignment_results: Dict) -> None:
+        """Stream a summary report of ID assignments including TeamWork issues to write()."""
+        
+        def emit(*lines):
+            for line in lines:
+                write(line + "\n")
         
         # Count by element type
         type_counts = defaultdict(int)
         kept_unchanged = defaultdict(int)
         assigned_new = defaultdict(int)
+        changed_keys = new_id_mapping.keys()
         
-        for elem_data in elements:
-            element_type = elem_data['type']
-            element_guid = elem_data['guid']
-            
+        total_elements = len(elements['guids'])
+        
+        for element_guid, element_type in zip(elements['guids'], elements['types']):
             type_counts[element_type] += 1
             
-            if element_guid in new_id_mapping:
+            if element_guid in changed_keys:
                 assigned_new[element_type] += 1
             else:
                 kept_unchanged[element_type] += 1
         
-        report_lines = [
+        emit(
             "SMART ELEMENT ID ASSIGNMENT REPORT (TeamWork Compatible)",
             "=" * 60,
-            f"Total Elements Analyzed: {len(elements)}",
+            f"Total Elements Analyzed: {total_elements}",
             f"Elements with Unique IDs (kept unchanged): {analysis['unique_ids']}",
             f"Elements with Empty IDs (needed new): {analysis['empty_ids']}",
             f"Elements with Duplicate IDs (needed new): {analysis['duplicate_count']}",
@@ -405,21 +446,21 @@ class SmartUniqueIDAssigner:
             "-" * 30,
             f"✓ Kept {analysis['unique_ids']} existing unique IDs unchanged",
             f"✓ Successfully processed {assignment_results['success_count']} elements that needed changes"
-        ]
+        )
         
         if assignment_results['permission_denied_count'] > 0:
-            report_lines.extend([
+            emit(
                 f"⚠ {assignment_results['permission_denied_count']} elements couldn't be changed (TeamWork permissions)",
-                f"✓ Result: {len(elements) - assignment_results['permission_denied_count'] - assignment_results['other_errors']} elements have unique IDs"
-            ])
+                f"✓ Result: {total_elements - assignment_results['permission_denied_count'] - assignment_results['other_errors']} elements have unique IDs"
+            )
         else:
-            report_lines.append(f"✓ Result: All {len(elements)} elements now have unique IDs")
+            emit(f"✓ Result: All {total_elements} elements now have unique IDs")
         
-        report_lines.extend([
+        emit(
             "",
             "ELEMENT TYPE BREAKDOWN:",
             "-" * 30
-        ])
+        )
         
         for element_type in sorted(type_counts.keys()):
             total = type_counts[element_type]
@@ -427,67 +468,67 @@ class SmartUniqueIDAssigner:
             new_assigned = assigned_new[element_type]
             prefix = self.element_prefixes.get(element_type, 'GEN')
             
-            report_lines.append(f"\n{element_type.upper()} (Total: {total}, Prefix: {prefix}):")
-            report_lines.append(f"  Kept unchanged: {kept} elements")
-            report_lines.append(f"  Assigned new IDs: {new_assigned} elements")
+            emit(f"\n{element_type.upper()} (Total: {total}, Prefix: {prefix}):")
+            emit(f"  Kept unchanged: {kept} elements")
+            emit(f"  Assigned new IDs: {new_assigned} elements")
         
         # TeamWork issues section
         if assignment_results['failed_elements']:
-            report_lines.extend([
+            emit(
                 "",
                 "TEAMWORK PERMISSION ISSUES:",
                 "-" * 30
-            ])
+            )
             
             permission_failures = [elem for elem in assignment_results['failed_elements'] 
-                                 if 'permission' in elem['reason'].lower()]
+                                 if 'permission' in elem.reason.lower()]
             
             if permission_failures:
-                report_lines.append(f"\nElements that couldn't be modified (reserved by other users):")
+                emit(f"\nElements that couldn't be modified (reserved by other users):")
                 for elem in permission_failures[:10]:  # Show first 10
-                    report_lines.append(f"  {elem['guid']} → (wanted: {elem['new_id']}) - {elem['reason']}")
+                    emit(f"  {elem.guid} → (wanted: {elem.new_id}) - {elem.reason}")
                 
                 if len(permission_failures) > 10:
-                    report_lines.append(f"  ... and {len(permission_failures) - 10} more elements")
+                    emit(f"  ... and {len(permission_failures) - 10} more elements")
                 
-                report_lines.extend([
+                emit(
                     "",
                     "TEAMWORK SOLUTIONS:",
                     "• Ask other users to release reserved elements",
                     "• Run the script again after elements are released",
                     "• Coordinate with team members to avoid conflicts"
-                ])
+                )
         
         if analysis['duplicate_elements'] and assignment_results['success_count'] > 0:
-            report_lines.extend([
+            emit(
                 "",
                 "DUPLICATE IDs SUCCESSFULLY FIXED:",
                 "-" * 30
-            ])
+            )
+            
+            failed_guids = {elem.guid for elem in assignment_results['failed_elements']}
             
             duplicate_groups = defaultdict(list)
             for guid, old_id in analysis['duplicate_elements'].items():
                 # Only show successfully fixed duplicates
-                if guid in new_id_mapping and not any(elem['guid'] == guid for elem in assignment_results['failed_elements']):
+                if guid in new_id_mapping and guid not in failed_guids:
                     duplicate_groups[old_id].append(guid)
             
             for old_id, guids in duplicate_groups.items():
                 if guids:  # Only show if we have successfully fixed elements
-                    report_lines.append(f"\nDuplicate ID '{old_id}' fixed on {len(guids)} elements:")
+                    emit(f"\nDuplicate ID '{old_id}' fixed on {len(guids)} elements:")
                     for guid in guids:
                         new_id = new_id_mapping.get(guid, "ERROR")
-                        report_lines.append(f"  {guid} → {new_id}")
+                        emit(f"  {guid} → {new_id}")
         
-        report_lines.extend([
+        emit(
             "",
             "=" * 60,
             "STATUS: Smart ID assignment completed with TeamWork compatibility",
             "EFFICIENCY: Only changed elements that actually needed new IDs",
             "TEAMWORK: Handled permission restrictions gracefully",
             "Generated by Smart ArchiCAD Unique ID Assigner"
-        ])
-        
-        return "\n".join(report_lines)
+        )
     
     def assign_unique_ids_to_all_elements(self) -> bool:
         """Main process to assign unique IDs only to elements that need them with TeamWork support."""
@@ -499,12 +540,15 @@ class SmartUniqueIDAssigner:
             
             # Step 1: Get all elements
             elements = self.get_all_elements_fast()
-            if not elements:
+            if not elements['guids']:
                 print("❌ No elements found!")
                 return False
             
             # Step 2: Get existing IDs
             existing_ids = self.get_existing_ids_bulk(elements)
+            if existing_ids is None:
+                print("❌ Could not read existing Element IDs - no IDs were changed.")
+                return False
             
             # Step 3: Analyze which elements actually need new IDs
             analysis = self.analyze_existing_ids(existing_ids)
@@ -519,16 +563,17 @@ class SmartUniqueIDAssigner:
                 print("=" * 50)
                 return True
             
-            # Step 5: Assign new IDs using ultra-fast individual processing
+            # Step 5: Assign new IDs using ultra-fast batched processing
             assignment_results = self.assign_ids_super_fast(new_id_mapping)
             
             # Step 6: Generate report
-            print("Generating assignment report...")
-            report = self.generate_assignment_report(elements, analysis, new_id_mapping, existing_ids, assignment_results)
-            report_path = os.path.join(current_dir, "smart_id_assignment_report.txt")
-            
-            with open(report_path, 'w', encoding='utf-8') as f:
-                f.write(report)
+            report_path = None
+            if self.generate_report:
+                print("Generating assignment report...")
+                report_path = os.path.join(current_dir, "smart_id_assignment_report.txt")
+                
+                with open(report_path, 'w', encoding='utf-8') as f:
+                    self.generate_assignment_report(f.write, elements, analysis, new_id_mapping, existing_ids, assignment_results)
             
             # Display results
             print("=" * 50)
@@ -544,9 +589,11 @@ class SmartUniqueIDAssigner:
             if assignment_results['other_errors'] > 0:
                 print(f"⚠ {assignment_results['other_errors']} elements had other errors")
             
-            total_unique = len(elements) - assignment_results['permission_denied_count'] - assignment_results['other_errors']
-            print(f"✓ Result: {total_unique}/{len(elements)} elements have unique IDs")
-            print(f"✓ Assignment report: {report_path}")
+            total_elements = len(elements['guids'])
+            total_unique = total_elements - assignment_results['permission_denied_count'] - assignment_results['other_errors']
+            print(f"✓ Result: {total_unique}/{total_elements} elements have unique IDs")
+            if report_path:
+                print(f"✓ Assignment report: {report_path}")
             print(f"✓ Location: {current_dir}")
             print("=" * 50)
             
@@ -568,7 +615,7 @@ def main():
             print("\n🎉 Ultra-fast Smart ID assignment completed!")
             print("Only elements with duplicate/empty IDs were changed.")
             print("Existing unique IDs were preserved unchanged.")
-            print("Individual element processing provided immediate feedback.")
+            print("Batched element processing kept API round-trips to a minimum.")
             print("TeamWork permissions were handled instantly without delays.")
         else:
             print("\n❌ ID assignment failed. Check the log for details.")
@@ -592,23 +639,24 @@ if __name__ == "__main__":
     - Analyze all existing Element IDs
     - Identify duplicates and empty IDs
     - Keep existing unique IDs unchanged (no unnecessary changes)
-    - Process elements individually for immediate feedback
-    - Assign new construction-standard IDs with real-time progress
+    - Process elements in batches with regular progress updates
+    - Assign new construction-standard IDs, reporting problems after each batch
     - Handle TeamWork permission restrictions instantly (no long waits)
     - Complete available elements in minutes, not hours
     
     Ultra-Fast Features:
-    ✓ Individual element processing for immediate response
-    ✓ Real-time feedback on each element (✓ success, ⚠ denied, ❌ error)
+    ✓ Batched element processing for fewer API round-trips
+    ✓ Console feedback on problem elements (⚠ denied, ❌ error)
+    ✓ Per-element success lines in the process log
     ✓ No long waits for TeamWork timeouts
-    ✓ Progress tracking with live updates
+    ✓ Progress updates as each batch completes
     ✓ Can be stopped early with Ctrl+C if needed
     
     TeamWork Features:
     ✓ Handles elements reserved by other users instantly
     ✓ No delays waiting for permission responses
     ✓ Continues processing immediately after permission denials
-    ✓ Provides clear real-time feedback about reserved elements
+    ✓ Lists reserved elements once their batch has been processed
     
     Smart Features:
     ✓ Only changes elements with duplicate or empty IDs
@@ -628,13 +676,10 @@ if __name__ == "__main__":
     - smart_id_assignment_report.txt: Detailed assignment summary
     - archicad_smart_id_assignment.log: Process log
     
-    Real-Time Output Example:
-    "✓ 1/50: W-001 assigned"
+    Console Output Example (printed as each batch completes):
     "⚠ 2/50: W-002 - Permission denied"
-    "✓ 3/50: W-003 assigned"
     "Progress: 25/50 (20 success, 5 denied)"
     
-    Speed: Processes elements individually with immediate feedback
-    No more waiting 15+ minutes for batch operations!
+    Speed: Sends one request per batch of elements (500 by default)
     """
     main()
\ No newline at end of file
@@ -21,9 +21,13 @@ Date: 2025-06-15
 import archicad
 from archicad import ACConnection
 import csv
+import gzip
 import os
-from typing import Dict, List
+import queue
+import threading
+from typing import Dict, Iterator, List, Tuple
 import logging
+from collections import defaultdict
 from datetime import datetime
 
 # Configure simple logging
@@ -39,14 +43,27 @@ logging.basicConfig(
     ]
 )
 
+class ExportDialect(csv.excel):
+    """Fixed CSV format for exports: comma separated, quoting only fields that need it."""
+    quoting = csv.QUOTE_MINIMAL
+
+
 class FastElementExtractor:
     """
     Fast element data extractor for ArchiCAD.
     Gets ALL properties and measurements you see in the element properties palette.
     """
     
-    def __init__(self):
-        """Initialize connection to ArchiCAD."""
+    def __init__(self, batch_size: int = 500):
+        """Initialize connection to ArchiCAD.
+        
+        Args:
+            batch_size: Number of elements sent per GetPropertyValuesOfElements call
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.batch_size = batch_size
+        
         try:
             print("Connecting to ArchiCAD...")
             self.conn = ACConnection.connect()
@@ -68,6 +85,33 @@ class FastElementExtractor:
                         'Stair', 'Railing', 'Door', 'Window', 'Skylight', 
                         'Zone', 'Mesh', 'Morph', 'Shell', 'Object']
         
+        # Preferred path: fetch every element and its type in two round-trips, then bucket locally
+        try:
+            elements = self.acc.GetAllElements()
+            element_type_results = self.acc.GetTypesOfElements(elements)
+            
+            elements_by_type = defaultdict(list)
+            for element, type_result in zip(elements, element_type_results):
+                type_info = getattr(type_result, 'typeOfElement', None)
+                if type_info is not None:
+                    elements_by_type[type_info.elementType].append(element)
+            
+            for elem_type in element_types:
+                type_elements = elements_by_type.get(elem_type, [])
+                for element in type_elements:
+                    all_elements.append({
+                        'element': element,
+                        'type': elem_type
+                    })
+                print(f"  Found {len(type_elements)} {elem_type} elements")
+            
+            print(f"Total elements found: {len(all_elements)}")
+            return all_elements
+        except Exception as e:
+            print(f"  Bulk element query unavailable ({e}), querying by type...")
+            all_elements = []
+        
+        # Fallback: one query per type, one at a time (the connection's commands share a single request object)
         for elem_type in element_types:
             try:
                 elements = self.acc.GetElementsByType(elem_type)
@@ -83,20 +127,14 @@ class FastElementExtractor:
         print(f"Total elements found: {len(all_elements)}")
         return all_elements
     
-    def get_all_properties_bulk(self, elements: List) -> Dict:
-        """Get ALL available properties for all elements in bulk operations."""
-        print("Getting all properties and measurements...")
-        
-        # Create element wrappers
-        element_wrappers = []
-        element_map = {}
-        
-        for i, elem_data in enumerate(elements):
-            wrapper = self.act.ElementIdArrayItem(self.act.ElementId(elem_data['element'].elementId.guid))
-            element_wrappers.append(wrapper)
-            element_map[i] = elem_data
-        
-        # Get ALL property IDs available in the project
+    @staticmethod
+    def _property_name(property_detail):
+        """Name of a property definition, or None if ArchiCAD returned an error entry."""
+        definition = getattr(property_detail, 'propertyDefinition', None)
+        return getattr(definition, 'name', None)
+    
+    def get_property_definitions(self) -> Tuple[List, List]:
+        """Get ALL property IDs available in the project with their definitions."""
         print("  Discovering all available properties...")
         try:
             all_property_ids = self.acc.GetAllPropertyIds()
@@ -104,130 +142,159 @@ class FastElementExtractor:
             print(f"  Found {len(all_property_ids)} properties")
         except Exception as e:
             print(f"  Error getting property definitions: {e}")
-            return {}
+            return [], []
         
-        # Get all property values in one bulk operation
-        results = {}
-        try:
-            print("  Extracting property values for all elements...")
-            all_prop_values = self.acc.GetPropertyValuesOfElements(element_wrappers, all_property_ids)
+        return all_property_ids, property_details
+    
+    def iter_property_rows(self, elements: List, guids: List, element_wrappers: List, all_property_ids: List, property_details: List) -> Iterator[Tuple]:
+        """Yield (element GUID, row) with ALL property values, one element at a time."""
+        print("Getting all properties and measurements...")
+        
+        # Resolve property names once instead of per (element, property) pair
+        prop_names = [self._property_name(detail) for detail in property_details]
+        n_props = len(prop_names)
+        
+        # Get property values in fixed-size batches to bound response size and memory
+        batch_size = self.batch_size
+        if all_property_ids:
+            print(f"  Extracting property values in batches of {batch_size} elements...")
+        
+        row_count = 0
+        for start in range(0, len(element_wrappers), batch_size):
+            batch_end = min(start + batch_size, len(elements))
+            batch_prop_values = []
+            if all_property_ids:
+                try:
+                    batch_prop_values = self.acc.GetPropertyValuesOfElements(
+                        element_wrappers[start:start + batch_size], all_property_ids)
+                except Exception as e:
+                    print(f"  Error getting bulk properties: {e}")
             
-            for i, prop_values_wrapper in enumerate(all_prop_values):
-                if i >= len(element_map):
-                    continue
+            next_index = start
+            try:
+                for i, prop_values_wrapper in enumerate(batch_prop_values, start):
+                    if i >= batch_end:
+                        break
+                        
+                    element_guid = guids[i]
+                    element_type = elements[i]['type']
                     
-                element_guid = element_map[i]['element'].elementId.guid
-                element_type = element_map[i]['type']
-                
-                results[element_guid] = {
-                    'Element_Type': element_type,
-                    'Element_GUID': element_guid
-                }
-                
-                # Extract all property values
-                if prop_values_wrapper.propertyValues:
-                    for j, prop_value in enumerate(prop_values_wrapper.propertyValues):
-                        if j < len(property_details):
-                            try:
-                                prop_name = property_details[j].propertyDefinition.name
+                    row = {
+                        'Element_Type': element_type,
+                        'Element_GUID': element_guid
+                    }
+                    
+                    # Extract all property values; malformed entries are skipped without raising
+                    property_values = getattr(prop_values_wrapper, 'propertyValues', None)
+                    if property_values:
+                        for j, prop_value in enumerate(property_values):
+                            if j < n_props and prop_names[j] is not None:
+                                property_value = getattr(prop_value, 'propertyValue', None)
+                                if property_value is None:
+                                    continue
                                 
-                                if hasattr(prop_value.propertyValue, 'value') and prop_value.propertyValue.value is not None:
-                                    # Handle different value types
-                                    value = prop_value.propertyValue.value
-                                    if isinstance(value, (int, float)):
-                                        results[element_guid][prop_name] = str(value)
-                                    else:
-                                        results[element_guid][prop_name] = str(value)
+                                value = getattr(property_value, 'value', None)
+                                if value is None:
+                                    row[prop_names[j]] = "<Undefined>"
                                 else:
-                                    results[element_guid][prop_name] = "<Undefined>"
-                                    
-                            except Exception as e:
-                                # Skip problematic properties but continue processing
-                                continue
-                
-                # Progress indicator
-                if (i + 1) % 50 == 0:
-                    print(f"    Processed {i + 1}/{len(element_map)} elements...")
+                                    row[prop_names[j]] = value if type(value) is str else str(value)
                     
-        except Exception as e:
-            print(f"  Error getting bulk properties: {e}")
-            # Fallback to basic data only
-            for i, elem_data in enumerate(elements):
-                element_guid = elem_data['element'].elementId.guid
-                results[element_guid] = {
-                    'Element_Type': elem_data['type'],
+                    next_index = i + 1
+                    yield element_guid, row
+                    row_count += 1
+                    
+                    # Progress indicator
+                    if (i + 1) % 50 == 0:
+                        print(f"    Processed {i + 1}/{len(elements)} elements...")
+            except Exception as e:
+                print(f"  Error processing property values: {e}")
+            
+            # Fallback to basic data only for elements without property values
+            for i in range(next_index, batch_end):
+                element_guid = guids[i]
+                yield element_guid, {
+                    'Element_Type': elements[i]['type'],
                     'Element_GUID': element_guid
                 }
+                row_count += 1
         
-        print(f"  ✓ Extracted properties for {len(results)} elements")
-        return results
+        print(f"  ✓ Extracted properties for {row_count} elements")
     
-    def get_classifications_fast(self, elements: List) -> Dict:
+    @staticmethod
+    def _classification_column(system_name: str) -> str:
+        """CSV column name for a classification system."""
+        # Clean system name for CSV
+        clean_name = system_name.replace(' ', '_').replace('-', '_').replace('.', '_')
+        return f'Classification_{clean_name}'
+    
+    def get_classification_systems(self) -> List:
+        """Get all classification systems defined in the project."""
+        try:
+            return self.acc.GetAllClassificationSystems() or []
+        except Exception as e:
+            print(f"Warning: Error getting classification systems: {e}")
+            return []
+    
+    def get_classifications_fast(self, guids: List, element_wrappers: List, class_systems: List) -> Dict:
         """Get classifications quickly."""
         print("Getting classifications...")
         
         classifications = {}
         
         try:
-            # Get classification systems
-            class_systems = self.acc.GetAllClassificationSystems()
             if not class_systems:
                 print("  No classification systems found")
                 return {}
             
-            # Create element wrappers
-            element_wrappers = []
-            for elem_data in elements:
-                wrapper = self.act.ElementIdArrayItem(self.act.ElementId(elem_data['element'].elementId.guid))
-                element_wrappers.append(wrapper)
-            
-            # Create classification system IDs
+            # Create classification system IDs and their cleaned CSV column names once
             system_ids = []
-            system_names = {}
+            system_columns = {}
             for system in class_systems:
                 system_id = self.act.ClassificationSystemIdArrayItem(system.classificationSystemId)
                 system_ids.append(system_id)
-                system_names[system.classificationSystemId.guid] = system.name
+                system_columns[system.classificationSystemId.guid] = self._classification_column(system.name)
+            unknown_column = self._classification_column('Unknown_System')
             
             # Get all classifications in bulk
             all_classifications = self.acc.GetClassificationsOfElements(element_wrappers, system_ids)
             
             for i, class_wrapper in enumerate(all_classifications):
-                element_guid = elements[i]['element'].elementId.guid
+                element_guid = guids[i]
                 classifications[element_guid] = {}
                 
                 if class_wrapper.classificationIds:
                     for classification in class_wrapper.classificationIds:
+                        # Entries without a classificationId (errors) simply raise AttributeError
                         try:
-                            if hasattr(classification, 'classificationId') and classification.classificationId:
-                                system_guid = classification.classificationId.classificationSystemId.guid
-                                system_name = system_names.get(system_guid, 'Unknown_System')
-                                
-                                if (hasattr(classification.classificationId, 'classificationItemId') and 
-                                    classification.classificationId.classificationItemId):
-                                    item_name = classification.classificationId.classificationItemId.name
-                                else:
-                                    item_name = ""
-                                
-                                # Clean system name for CSV
-                                clean_name = system_name.replace(' ', '_').replace('-', '_').replace('.', '_')
-                                classifications[element_guid][f'Classification_{clean_name}'] = item_name
-                        except Exception as e:
+                            cid = classification.classificationId
+                            system_guid = cid.classificationSystemId.guid
+                            item = getattr(cid, 'classificationItemId', None)
+                            item_name = item.name if item else ""
+                        except AttributeError:
                             continue
+                        
+                        classifications[element_guid][system_columns.get(system_guid, unknown_column)] = item_name
                             
         except Exception as e:
             print(f"Warning: Error getting classifications: {e}")
-            for elem_data in elements:
-                classifications[elem_data['element'].elementId.guid] = {}
+            for element_guid in guids:
+                classifications[element_guid] = {}
         
         return classifications
     
-    def extract_to_csv(self, filename: str = None) -> bool:
-        """Extract all element data to CSV quickly."""
+    def extract_to_csv(self, filename: str = None, compress: bool = False) -> bool:
+        """Extract all element data to CSV quickly.
+        
+        Args:
+            filename: Output file name (timestamped by default)
+            compress: Write a gzip-compressed CSV (.csv.gz) directly
+        """
         try:
             if filename is None:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 filename = f"archicad_elements_{timestamp}.csv"
+            if compress and not filename.endswith('.gz'):
+                filename += '.gz'
             
             csv_path = os.path.join(current_dir, filename)
             
@@ -241,47 +308,114 @@ class FastElementExtractor:
                 print("❌ No elements found!")
                 return False
             
-            # Step 2: Get all properties and measurements (bulk operation)
-            properties_data = self.get_all_properties_bulk(elements)
+            # GUIDs and element wrappers are shared by the classification and property requests.
+            # Each element's GUID object is resolved once and reused for dict keys and row values.
+            guids = [elem_data['element'].elementId.guid for elem_data in elements]
+            element_wrappers = [self.act.ElementIdArrayItem(self.act.ElementId(guid)) for guid in guids]
             
-            # Step 3: Get classifications (bulk operation)  
-            classifications_data = self.get_classifications_fast(elements)
+            # Step 2: Get classifications (bulk operation)  
+            class_systems = self.get_classification_systems()
+            classifications_data = self.get_classifications_fast(guids, element_wrappers, class_systems)
             
-            # Step 4: Combine data and write CSV
+            # Step 3: Discover property definitions (no values needed for the header)
+            all_property_ids, property_details = self.get_property_definitions()
+            
+            # Step 4: Stream property rows straight into the CSV
             print("Writing CSV file...")
             
-            # Determine all column names
-            all_columns = set(['Element_GUID', 'Element_Type'])
-            for guid, data in properties_data.items():
-                all_columns.update(data.keys())
-            for guid, data in classifications_data.items():
-                all_columns.update(data.keys())
+            # Determine all column names from the definitions - no per-element scan needed
+            all_columns = ({'Element_GUID', 'Element_Type'}
+                           | {name for name in map(self._property_name, property_details) if name is not None}
+                           | {self._classification_column(system.name) for system in class_systems})
+            # Classifications from systems not in the system list are stored under Unknown_System
+            unknown_column = self._classification_column('Unknown_System')
+            if any(unknown_column in element_classes for element_classes in classifications_data.values()):
+                all_columns.add(unknown_column)
             
             # Sort columns for consistent output
             sorted_columns = ['Element_GUID', 'Element_Type'] + sorted([col for col in all_columns if col not in ['Element_GUID', 'Element_Type']])
             
-            # Write CSV
-            with open(csv_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=sorted_columns)
-                writer.writeheader()
+            # Write CSV through a 1 MiB buffer to cut write() syscalls on large exports,
+            # or compress on the fly (level 1 is cheap and shrinks property tables a lot)
+            if compress:
+                output = gzip.open(csv_path, 'wt', newline='', encoding='utf-8-sig', compresslevel=1)
+            else:
+                output = open(csv_path, 'w', newline='', encoding='utf-8-sig', buffering=1024 * 1024)
+            
+            with output as csvfile:
+                writer = csv.writer(csvfile, dialect=ExportDialect)
+                writer.writerow(sorted_columns)
                 
-                for elem_data in elements:
-                    guid = elem_data['element'].elementId.guid
-                    
-                    # Combine all data for this element
-                    row_data = properties_data.get(guid, {})
-                    row_data.update(classifications_data.get(guid, {}))
+                # Rows are written 1000 at a time from pools of preallocated output row lists
+                # that are overwritten in place; only the output lists are pooled.
+                # A background thread writes filled pools while the next batch is fetched;
+                # pools return through free_pools once written, so a pool is never refilled mid-write.
+                col_idx = {col: idx for idx, col in enumerate(sorted_columns)}
+                empty_row = [""] * len(sorted_columns)
+                rows_per_pool = 1000
+                filled_batches = queue.Queue(maxsize=4)
+                free_pools = queue.Queue()
+                for _ in range(filled_batches.maxsize + 2):
+                    free_pools.put([list(empty_row) for _ in range(rows_per_pool)])
+                write_errors = []
+                
+                def write_batches():
+                    while True:
+                        batch = filled_batches.get()
+                        if batch is None:
+                            return
+                        row_pool, count = batch
+                        try:
+                            if not write_errors:
+                                writer.writerows(row_pool if count == rows_per_pool else row_pool[:count])
+                        except Exception as e:
+                            write_errors.append(e)
+                        free_pools.put(row_pool)
+                
+                writer_thread = threading.Thread(target=write_batches, daemon=True)
+                writer_thread.start()
+                
+                # Skip the per-row classification merge on projects without classifications
+                have_class = any(classifications_data.values())
+                
+                try:
+                    row_pool = free_pools.get()
+                    pending = 0
                     
-                    # Ensure all columns are present
-                    complete_row = {}
-                    for col in sorted_columns:
-                        complete_row[col] = row_data.get(col, "")
+                    for guid, row_data in self.iter_property_rows(elements, guids, element_wrappers, all_property_ids, property_details):
+                        # Combine all data for this element
+                        if have_class:
+                            row_data.update(classifications_data.get(guid, ()))
+                        
+                        # Copy the element's row dict into its pooled output list by column index.
+                        # Missing columns stay empty; values outside the header are ignored
+                        row_buf = row_pool[pending]
+                        row_buf[:] = empty_row
+                        for col, value in row_data.items():
+                            idx = col_idx.get(col)
+                            if idx is not None:
+                                row_buf[idx] = value
+                        
+                        pending += 1
+                        if pending == rows_per_pool:
+                            filled_batches.put((row_pool, pending))
+                            row_pool = free_pools.get()
+                            pending = 0
                     
-                    writer.writerow(complete_row)
+                    if pending:
+                        filled_batches.put((row_pool, pending))
+                finally:
+                    filled_batches.put(None)
+                    writer_thread.join()
+                
+                if write_errors:
+                    raise write_errors[0]
             
             print("=" * 50)
             print(f"✓ SUCCESS! Extracted {len(elements)} elements")
             print(f"✓ CSV saved: {filename}")
+            if compress:
+                print("✓ Compressed with gzip - open with gzip.open() or pandas.read_csv()")
             print(f"✓ Properties extracted: {len(sorted_columns)}")
             print(f"✓ Includes: Element details, measurements, classifications")
             print(f"✓ Location: {current_dir}")